@@ -1,5 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 import random
+from server.load import load_monitor
+from server.game import game_manager
+from server.words import get_categories
 
 landing_bp = Blueprint('landing', __name__, template_folder='../templates')
 
@@ -15,6 +18,9 @@ def landing():
 
         # Create room → generate unique 6-digit numeric ID
         if action == 'create' and player_name:
+            if not load_monitor.admit('create_room'):
+                flash("Server busy, please try again in a moment.", "error")
+                return render_template('landing.html', categories=get_categories()), 503
             new_room_id = str(random.randint(100000, 999999))  # 6-digit number
             active_rooms.add(new_room_id)
             return redirect(url_for('landing.lobby', room_id=new_room_id, player=player_name))
@@ -25,9 +31,32 @@ def landing():
                 return redirect(url_for('landing.lobby', room_id=room_id_input, player=player_name))
             else:
                 flash(f"Room ID {room_id_input} does not exist.", "error")
-                return render_template('landing.html')
+                return render_template('landing.html', categories=get_categories())
 
-    return render_template('landing.html')
+    return render_template('landing.html', categories=get_categories())
+
+@landing_bp.route('/quickplay', methods=['POST'])
+def quickplay():
+    player_name = request.form.get('player_name', '').strip()
+    category = request.form.get('category') or None
+    if not player_name:
+        flash("Please enter your name.", "error")
+        return render_template('landing.html', categories=get_categories()), 400
+    if category not in get_categories():
+        category = None
+
+    if not load_monitor.admit('quickplay'):
+        flash("Server busy, please try again in a moment.", "error")
+        return render_template('landing.html', categories=get_categories()), 503
+
+    room_id = game_manager.quick_play(player_name, category)
+    active_rooms.add(room_id)
+    return redirect(url_for('landing.lobby', room_id=room_id, player=player_name))
+
+@landing_bp.route('/rooms')
+def list_rooms():
+    category = request.args.get('category') or None
+    return jsonify({'rooms': game_manager.list_open_rooms(category)})
 
 @landing_bp.route('/lobby/<room_id>')
 def lobby(room_id):
@@ -1,52 +1,73 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, join_room, leave_room, emit
 from Landing_Page.landingpage import landing_bp
+from server.admin import admin_bp
 from server.game import game_manager
 from server.models import GameStateEnum
+from server.recorder import traffic_recorder
+from server.load import load_monitor
 import time
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
 
-# Register blueprint
+# Register blueprints
 app.register_blueprint(landing_bp)
+app.register_blueprint(admin_bp)
 
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # Set socketio instance in game manager
 game_manager.set_socketio(socketio)
 
+# Start measuring server lag for admission control
+load_monitor.start()
+
 # Route for game room
 @app.route('/room/<room_id>')
 def room(room_id):
     player_name = request.args.get('player', 'Guest')
     return render_template('room.html', room_id=room_id, player_name=player_name)
 
+# Server lag and load shedding stats
+@app.route('/metrics/load')
+def load_metrics():
+    return jsonify(load_monitor.snapshot())
+
+# Chat batching stats
+@app.route('/metrics/chat')
+def chat_metrics():
+    return jsonify(game_manager.chat.snapshot())
+
+def can_draw(room, player) -> bool:
+    """Only the drawer may draw during a game; anyone in the room may doodle before or after"""
+    if not player:
+        return False
+    return room.game_state != GameStateEnum.IN_PROGRESS or player.name == room.current_drawer
+
 @socketio.on('connect')
+@traffic_recorder.track('connect')
 def handle_connect():
     """Handle client connection"""
     emit('connected', {'status': 'connected'})
 
 @socketio.on('disconnect')
+@traffic_recorder.track('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    # Find and remove player from all rooms
+    # Find the player's room; they are removed after the resume grace period
     from flask import request as flask_request
     socket_id = flask_request.sid
     
     # Search all rooms for this socket
     for room_id in list(game_manager.rooms.keys()):
-        player_name = game_manager.remove_player(room_id, socket_id)
+        player_name = game_manager.disconnect_player(room_id, socket_id)
         if player_name:
             leave_room(room_id)
-            room = game_manager.get_room(room_id)
-            if room:  # Room still exists
-                emit('player_left', {'player': player_name}, room=room_id, include_self=False)
-                players_data = [p.to_dict() for p in room.players.values()]
-                emit('update_player_list', {'players': players_data}, room=room_id)
             break
 
 @socketio.on('join_room')
+@traffic_recorder.track('join_room')
 def handle_join(data):
     """Handle player joining a room"""
     room_id = data.get('room_id') or data.get('roomCode')
@@ -56,30 +77,89 @@ def handle_join(data):
         emit('error', {'message': 'Room ID required'})
         return
     
+    # Shed new players while the server is lagging; players already in the room may rejoin
+    room = game_manager.get_room(room_id)
+    if not (room and player_name in room.players) and not load_monitor.admit('join_room'):
+        emit('error', {'message': 'Server busy, please try again in a moment', 'code': 'server_busy'})
+        return
+    
     # Try to add player
-    success, is_host = game_manager.add_player(room_id, player_name, request.sid)
+    success, is_host, error = game_manager.add_player(room_id, player_name, request.sid,
+                                                      data.get('resume_token'))
     
     if not success:
-        emit('error', {'message': 'Player name already taken in this room'})
+        emit('error', {'message': error})
         return
 
     join_room(room_id)
     room = game_manager.get_room(room_id)
     
+    # Give the player a token and the current sequence number so they can resume later
+    player = room.players[player_name]
+    emit('session', {'token': player.resume_token, 'seq': room.event_seq}, room=request.sid)
+    traffic_recorder.record('_session_issued', request.sid, {'token': player.resume_token})
+    
     # Send updated player list to all in room
     players_data = [p.to_dict() for p in room.players.values()]
-    emit('update_player_list', {'players': players_data}, room=room_id)
+    game_manager.broadcast(room_id, 'update_player_list', {'players': players_data})
     
     # Send current game state to the new player
     game_state = game_manager.get_game_state(room_id)
     if game_state:
         emit('game_state', game_state, room=request.sid)
     
+    # Send the drawing so far
+    canvas_ops = room.canvas.snapshot()
+    if canvas_ops:
+        emit('canvas_ops', {'ops': canvas_ops, 'snapshot': True}, room=request.sid)
+    
     # Notify if player is host
     if is_host:
         emit('you_are_host', {}, room=request.sid)
 
+@socketio.on('resume_session')
+@traffic_recorder.track('resume_session')
+def handle_resume(data):
+    """Handle a reconnecting player: replay only the room events they missed"""
+    room_id = data.get('room_id') or data.get('roomCode')
+    try:
+        last_seq = int(data.get('last_seq') or 0)
+    except (TypeError, ValueError):
+        last_seq = None  # Unknown position: send full state
+    
+    player = game_manager.resume_player(room_id, data.get('token'), request.sid)
+    if not player:
+        emit('resume_failed', {'message': 'Session expired'}, room=request.sid)
+        return
+    
+    join_room(room_id)
+    room = game_manager.get_room(room_id)
+    missed = None
+    if last_seq is not None:
+        missed = game_manager.get_missed_events(room_id, last_seq, player.name)
+    
+    if missed is None:
+        # Too far behind the buffered window: fall back to full state
+        players_data = [p.to_dict() for p in room.players.values()]
+        emit('update_player_list', {'players': players_data, 'seq': room.event_seq}, room=request.sid)
+        emit('game_state', game_manager.get_game_state(room_id), room=request.sid)
+        emit('canvas_ops', {'ops': room.canvas.snapshot(), 'snapshot': True}, room=request.sid)
+    else:
+        for seq, event, payload in missed:
+            emit(event, payload, room=request.sid)
+    
+    # Private state isn't in the room buffer
+    if player.name == room.current_drawer and room.current_word:
+        emit('your_word', {'word': room.current_word}, room=request.sid)
+    
+    emit('session_resumed', {
+        'seq': room.event_seq,
+        'replayed': len(missed) if missed is not None else 0,
+        'full_state': missed is None
+    }, room=request.sid)
+
 @socketio.on('start_game')
+@traffic_recorder.track('start_game')
 def handle_start_game(data):
     """Handle game start request (only host can start)"""
     room_id = data.get('room_id') or data.get('roomCode')
@@ -106,27 +186,59 @@ def handle_start_game(data):
     success = game_manager.start_game(room_id)
     if success:
         game_state = game_manager.get_game_state(room_id)
-        emit('game_started', game_state, room=room_id)
+        game_manager.broadcast(room_id, 'game_started', game_state)
 
 @socketio.on('drawing')
+@traffic_recorder.track('drawing')
 def handle_drawing(data):
     """Handle drawing strokes from canvas"""
     room_id = data.get('room_id') or data.get('room')
     
-    if not room_id:
+    room = game_manager.get_room(room_id)
+    if not room or not can_draw(room, room.get_player_by_socket(request.sid)):
         return
     
     # Broadcast to all except sender
-    emit('update_canvas', {
+    game_manager.broadcast(room_id, 'update_canvas', {
         'x0': data.get('x0') or data.get('prevX'),
         'y0': data.get('y0') or data.get('prevY'),
         'x1': data.get('x1') or data.get('x'),
         'y1': data.get('y1') or data.get('y'),
         'color': data.get('color'),
         'size': data.get('size') or data.get('lineWidth')
-    }, room=room_id, include_self=False)
+    }, skip_sid=request.sid)
+
+@socketio.on('draw_ops')
+@traffic_recorder.track('draw_ops')
+def handle_draw_ops(data):
+    """Handle a batch of compact drawing ops (strokes, fills, shapes, undo/redo)"""
+    room_id = data.get('room_id') or data.get('room')
+    ops = data.get('ops')
+    
+    if not room_id or not isinstance(ops, list):
+        return
+    
+    room = game_manager.get_room(room_id)
+    if not room:
+        return
+    
+    if not can_draw(room, room.get_player_by_socket(request.sid)):
+        emit('error', {'message': 'Only the drawer can draw'}, room=request.sid)
+        return
+    
+    # Record valid ops and relay them to everyone except sender
+    accepted = []
+    for op in ops:
+        if isinstance(op, dict):
+            normalized = room.canvas.apply(op)
+            if normalized:
+                accepted.append(normalized)
+    
+    if accepted:
+        game_manager.broadcast(room_id, 'canvas_ops', {'ops': accepted}, skip_sid=request.sid)
 
 @socketio.on('guess')
+@traffic_recorder.track('guess')
 def handle_guess(data):
     """Handle word guess submission"""
     room_id = data.get('room_id') or data.get('roomCode')
@@ -150,13 +262,13 @@ def handle_guess(data):
     
     if result.get('correct'):
         # Correct guess
-        emit('correct_guess', {
+        game_manager.broadcast(room_id, 'correct_guess', {
             'player': player.name,
             'word': result.get('word'),
             'points': result.get('points'),
             'drawer_bonus': result.get('drawer_bonus', 0),
             'scores': result.get('scores')
-        }, room=room_id)
+        })
         
         # If round should end, end it
         if result.get('end_round'):
@@ -169,20 +281,31 @@ def handle_guess(data):
         if result.get('censored'):
             emit('blocked_message', {'message': 'Invalid guess - word detected'}, room=request.sid)
         else:
-            # Show wrong guess as regular chat message
-            emit('new_message', {
+            # Show wrong guess as regular chat message (batched with other chat)
+            game_manager.chat.post(room_id, {
                 'player': player.name,
                 'message': guess
-            }, room=room_id)
+            })
 
 
 @socketio.on('clear_canvas')
+@traffic_recorder.track('clear_canvas')
 def handle_clear_canvas(data):
     """Handle canvas clear"""
     room_id = data.get('room_id')
-    emit('canvas_cleared', {}, room=room_id, include_self=False)
+    if not room_id:
+        return
+    room = game_manager.get_room(room_id)
+    if not room:
+        return
+    if not can_draw(room, room.get_player_by_socket(request.sid)):
+        emit('error', {'message': 'Only the drawer can clear the canvas'}, room=request.sid)
+        return
+    room.canvas.clear()
+    game_manager.broadcast(room_id, 'canvas_cleared', {}, skip_sid=request.sid)
 
 @socketio.on('send_message')
+@traffic_recorder.track('send_message')
 def handle_message(data):
     """Handle chat message (non-guess)"""
     room_id = data.get('room_id') or data.get('roomCode')
@@ -205,13 +328,14 @@ def handle_message(data):
             emit('blocked_message', {'message': 'Message blocked - word detected'}, room=request.sid)
             return
     
-    emit('new_message', {
+    game_manager.chat.post(room_id, {
         'player': player.name,
         'message': message,
         'timestamp': data.get('timestamp')
-    }, room=room_id)
+    })
 
 @socketio.on('get_game_state')
+@traffic_recorder.track('get_game_state')
 def handle_get_state(data):
     """Handle game state request"""
     room_id = data.get('room_id') or data.get('roomCode')
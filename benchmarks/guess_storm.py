@@ -0,0 +1,110 @@
+"""Simulate a guess storm and compare chat fan-out with and without batching.
+
+Usage:
+    python benchmarks/guess_storm.py --players 8 --guesses 200 --window 100 --max-batch 50
+
+Runs in-process with Socket.IO test clients. Every player except the
+drawer sends wrong guesses from its own thread. The storm runs once with
+batching off (one new_message broadcast per guess) and once with the
+given window and batch cap. Reports chat frames delivered, batch sizes, and how long a
+correct guess takes to reach the room while the storm is going on.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, socketio  # noqa: E402
+from server.game import game_manager  # noqa: E402
+from server.chat import ChatBatcher  # noqa: E402
+
+CHAT_EVENTS = ('new_message', 'chat_batch')
+
+def run_storm(room_id: str, players: int, guesses: int, window_ms: float, max_batch: int) -> dict:
+    game_manager.chat = ChatBatcher(game_manager.broadcast, window_ms, max_batch)
+
+    clients = []
+    for i in range(players):
+        client = socketio.test_client(app)
+        client.emit('join_room', {'room_id': room_id, 'player_name': f'p{i}'})
+        clients.append(client)
+    clients[0].emit('start_game', {'room_id': room_id})
+    for client in clients:
+        client.get_received()
+
+    room = game_manager.get_room(room_id)
+    guessers = [c for i, c in enumerate(clients) if f'p{i}' != room.current_drawer]
+
+    def spam(client, index):
+        for n in range(guesses):
+            client.emit('guess', {'room_id': room_id, 'guess': f'zq{index}x{n}'})
+
+    threads = [threading.Thread(target=spam, args=(c, i)) for i, c in enumerate(guessers[1:])]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    # Correct guess in the middle of the storm
+    time.sleep(0.05)
+    correct_started = time.perf_counter()
+    guessers[0].emit('guess', {'room_id': room_id, 'guess': room.current_word})
+    correct_latency = time.perf_counter() - correct_started
+
+    for thread in threads:
+        thread.join()
+    storm_time = time.perf_counter() - started
+    time.sleep(window_ms / 1000 + 0.1)  # Let the last batch flush
+
+    chat_frames = 0
+    chat_messages = 0
+    for client in clients:
+        for packet in client.get_received():
+            if packet['name'] == 'new_message':
+                chat_frames += 1
+                chat_messages += 1
+            elif packet['name'] == 'chat_batch':
+                chat_frames += 1
+                chat_messages += len(packet['args'][0]['messages'])
+
+    game_manager.shutdown_rooms([room_id])
+    for client in clients:
+        client.disconnect()
+
+    return {
+        'storm_time': storm_time,
+        'chat_frames': chat_frames,
+        'chat_messages': chat_messages,
+        'correct_latency': correct_latency,
+        'stats': game_manager.chat.snapshot()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chat batching under a guess storm')
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--guesses', type=int, default=200, help='Wrong guesses per player')
+    parser.add_argument('--window', type=float, default=100, help='Batch window in ms')
+    parser.add_argument('--max-batch', type=int, default=50, help='Messages that force an early flush')
+    args = parser.parse_args()
+
+    baseline = run_storm('900001', args.players, args.guesses, 0, args.max_batch)
+    batched = run_storm('900002', args.players, args.guesses, args.window, args.max_batch)
+
+    print(f"Players: {args.players}, wrong guesses per guesser: {args.guesses}")
+    for label, result in (('unbatched', baseline), (f'batched {args.window:.0f}ms', batched)):
+        print(f"\n{label}")
+        print(f"  storm duration:        {result['storm_time']:.2f} s")
+        print(f"  chat frames delivered: {result['chat_frames']} ({result['chat_messages']} messages)")
+        print(f"  correct_guess handled: {result['correct_latency'] * 1000:.2f} ms")
+    stats = batched['stats']
+    print(f"\nbatches: {stats['batches']} ({stats['early_flushes']} flushed early at {stats['max_batch']}), "
+          f"avg size {stats['avg_batch_size']}, max size {stats['max_batch_size']}")
+    print(f"room broadcasts saved: {stats['emits_saved']}")
+    if batched['chat_frames']:
+        print(f"emit reduction: {baseline['chat_frames'] / batched['chat_frames']:.1f}x")
+
+if __name__ == '__main__':
+    main()
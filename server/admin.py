@@ -0,0 +1,93 @@
+"""Admin API for creating, starting and closing rooms in bulk (tournaments, events)"""
+
+import hmac
+import os
+from functools import wraps
+from flask import Blueprint, request, jsonify
+from server.game import game_manager
+from Landing_Page.landingpage import active_rooms
+from server.words import get_categories
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+# Requests must send this key in the X-Admin-Key header; the API is off when unset
+ADMIN_KEY_ENV_VAR = 'PAINTIT_ADMIN_KEY'
+MAX_BULK_ROOMS = 10000
+
+def require_admin_key(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admin_key = os.environ.get(ADMIN_KEY_ENV_VAR)
+        if not admin_key:
+            return jsonify({'error': 'Admin API is disabled'}), 403
+        if not hmac.compare_digest(request.headers.get('X-Admin-Key', '').encode(), admin_key.encode()):
+            return jsonify({'error': 'Invalid admin key'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _room_ids_from_request(data: dict):
+    room_ids = data.get('room_ids')
+    if not isinstance(room_ids, list) or len(room_ids) > MAX_BULK_ROOMS:
+        return None
+    return [str(room_id) for room_id in room_ids]
+
+@admin_bp.route('/rooms', methods=['GET'])
+@require_admin_key
+def room_summary():
+    states = {}
+    for room in list(game_manager.rooms.values()):
+        states[room.game_state.value] = states.get(room.game_state.value, 0) + 1
+    return jsonify({
+        'rooms': len(game_manager.rooms),
+        'by_state': states,
+        'active_timers': len(game_manager.ticker.rounds),
+        'last_tick_ms': round(game_manager.ticker.last_tick_duration * 1000, 2)
+    })
+
+@admin_bp.route('/rooms', methods=['POST'])
+@require_admin_key
+def create_rooms():
+    data = request.get_json(silent=True) or {}
+    count = data.get('count', 1)
+    max_rounds = data.get('max_rounds', 5)
+    category = data.get('category') or None
+
+    if not isinstance(count, int) or not 1 <= count <= MAX_BULK_ROOMS:
+        return jsonify({'error': f'count must be between 1 and {MAX_BULK_ROOMS}'}), 400
+    if not isinstance(max_rounds, int) or max_rounds < 1:
+        return jsonify({'error': 'max_rounds must be a positive integer'}), 400
+    if category is not None and category not in get_categories():
+        return jsonify({'error': f'Unknown category {category}'}), 400
+
+    room_ids = game_manager.create_rooms(count, max_rounds, category, bool(data.get('public')))
+    # Make the rooms joinable by code from the landing page
+    active_rooms.update(room_ids)
+    return jsonify({'room_ids': room_ids}), 201
+
+@admin_bp.route('/rooms/start', methods=['POST'])
+@require_admin_key
+def start_rooms():
+    data = request.get_json(silent=True) or {}
+    room_ids = _room_ids_from_request(data)
+    stagger = data.get('stagger_seconds', 5.0)
+
+    if room_ids is None:
+        return jsonify({'error': f'room_ids must be a list of at most {MAX_BULK_ROOMS} rooms'}), 400
+    if not isinstance(stagger, (int, float)) or stagger < 0:
+        return jsonify({'error': 'stagger_seconds must be a non-negative number'}), 400
+
+    scheduled, skipped = game_manager.start_games(room_ids, stagger)
+    return jsonify({'scheduled': scheduled, 'skipped': skipped})
+
+@admin_bp.route('/rooms/shutdown', methods=['POST'])
+@require_admin_key
+def shutdown_rooms():
+    data = request.get_json(silent=True) or {}
+    room_ids = _room_ids_from_request(data)
+
+    if room_ids is None:
+        return jsonify({'error': f'room_ids must be a list of at most {MAX_BULK_ROOMS} rooms'}), 400
+
+    closed = game_manager.shutdown_rooms(room_ids, data.get('message', 'This room has been closed'))
+    active_rooms.difference_update(room_ids)
+    return jsonify({'closed': closed})
@@ -0,0 +1,161 @@
+"""Compact drawing operations and per-room stroke-group index"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Ops that start a new stroke group
+GROUP_OPS = {'stroke_begin', 'fill', 'rect', 'ellipse'}
+# Ops that add to or close an existing stroke group
+STROKE_OPS = {'stroke_points', 'stroke_end'}
+# Ops that toggle a whole stroke group
+HISTORY_OPS = {'undo', 'redo'}
+
+# Limits to keep a single room's canvas log bounded
+MAX_POINTS_PER_OP = 512
+MAX_POINTS_PER_GROUP = 8192
+MAX_GROUPS = 2000
+MAX_COLOR_LENGTH = 32
+MAX_STROKE_ID_LENGTH = 64
+# Whole-canvas budget; the oldest groups are dropped to stay within it
+MAX_TOTAL_POINTS = 100000
+MAX_TOTAL_OPS = 10000
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def _is_color(value) -> bool:
+    return isinstance(value, str) and 0 < len(value) <= MAX_COLOR_LENGTH
+
+class CanvasLog:
+    """Records drawing ops grouped by stroke id.
+
+    Every drawing is a sequence of stroke groups (a freehand stroke, a fill,
+    a rectangle or an ellipse). Undo and redo flip a group's visibility, so
+    they cost one message regardless of how large the group is.
+    Handlers run on several threads, so every method holds the log's lock.
+    The log keeps at most MAX_GROUPS groups, MAX_TOTAL_POINTS points and
+    MAX_TOTAL_OPS ops, dropping the oldest groups first, so a late joiner's
+    snapshot stays bounded.
+    """
+
+    def __init__(self):
+        # stroke id -> {'ops': [...], 'undone': bool, 'points': int, 'closed': bool}
+        self.groups: Dict[str, dict] = {}
+        self.order: Deque[str] = deque()  # stroke ids in drawing order
+        self.total_points = 0
+        self.total_ops = 0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Forget every stroke group"""
+        with self._lock:
+            self.groups.clear()
+            self.order.clear()
+            self.total_points = 0
+            self.total_ops = 0
+
+    def apply(self, op: dict) -> Optional[dict]:
+        """Validate and record an op. Returns the normalized op to relay, or None if invalid"""
+        with self._lock:
+            return self._apply(op)
+
+    def _apply(self, op: dict) -> Optional[dict]:
+        op_type = op.get('type')
+        stroke_id = op.get('id')
+        if stroke_id is None or not isinstance(stroke_id, (str, int)):
+            return None
+        stroke_id = str(stroke_id)
+        if len(stroke_id) > MAX_STROKE_ID_LENGTH:
+            return None
+
+        if op_type in GROUP_OPS:
+            if stroke_id in self.groups:
+                return None
+            normalized = self._normalize(op_type, stroke_id, op)
+            if normalized is None:
+                return None
+            self.groups[stroke_id] = {'ops': [normalized], 'undone': False, 'points': 0,
+                                      'closed': op_type != 'stroke_begin'}
+            self.order.append(stroke_id)
+            self.total_ops += 1
+            self._evict(stroke_id)
+            return normalized
+
+        group = self.groups.get(stroke_id)
+        if group is None:
+            return None
+
+        if op_type in STROKE_OPS:
+            # Only open freehand strokes take more points
+            if group['closed']:
+                return None
+            normalized = self._normalize(op_type, stroke_id, op)
+            if normalized is None:
+                return None
+            if op_type == 'stroke_points':
+                group['points'] += len(normalized['points']) // 2
+                if group['points'] > MAX_POINTS_PER_GROUP:
+                    group['points'] -= len(normalized['points']) // 2
+                    return None
+                self.total_points += len(normalized['points']) // 2
+            else:
+                group['closed'] = True
+            group['ops'].append(normalized)
+            self.total_ops += 1
+            self._evict(stroke_id)
+            return normalized
+
+        if op_type in HISTORY_OPS:
+            group['undone'] = op_type == 'undo'
+            return {'type': op_type, 'id': stroke_id}
+
+        return None
+
+    def _evict(self, keep: str):
+        """Drop the oldest groups until the log is within its limits, keeping `keep`"""
+        while (len(self.order) > MAX_GROUPS or self.total_points > MAX_TOTAL_POINTS
+               or self.total_ops > MAX_TOTAL_OPS) and self.order[0] != keep:
+            group = self.groups.pop(self.order.popleft())
+            self.total_points -= group['points']
+            self.total_ops -= len(group['ops'])
+
+    def _normalize(self, op_type: str, stroke_id: str, op: dict) -> Optional[dict]:
+        """Copy only the fields an op type uses, or None if any of them is malformed"""
+        normalized = {'type': op_type, 'id': stroke_id}
+        if op_type == 'stroke_begin':
+            if not _is_color(op.get('color')) or not _is_number(op.get('size')):
+                return None
+            normalized.update(color=op['color'], size=op['size'])
+        elif op_type == 'stroke_points':
+            points = op.get('points')
+            # Flat [x0, y0, x1, y1, ...] list
+            if not isinstance(points, list) or not points or len(points) % 2 \
+                    or len(points) > MAX_POINTS_PER_OP * 2 or not all(map(_is_number, points)):
+                return None
+            normalized['points'] = points
+        elif op_type == 'fill':
+            if not (_is_number(op.get('x')) and _is_number(op.get('y')) and _is_color(op.get('color'))):
+                return None
+            normalized.update(x=op['x'], y=op['y'], color=op['color'])
+        elif op_type in ('rect', 'ellipse'):
+            if not all(_is_number(op.get(key)) for key in ('x', 'y', 'w', 'h', 'size')) \
+                    or not _is_color(op.get('color')):
+                return None
+            normalized.update(x=op['x'], y=op['y'], w=op['w'], h=op['h'],
+                              color=op['color'], size=op['size'],
+                              filled=bool(op.get('filled')))
+        return normalized
+
+    def snapshot(self) -> List[dict]:
+        """Ops needed to rebuild the canvas. Undone groups are included, followed
+        by an undo op, so a later redo has something to draw"""
+        with self._lock:
+            ops = []
+            for stroke_id in self.order:
+                group = self.groups[stroke_id]
+                ops.extend(group['ops'])
+                if group['undone']:
+                    ops.append({'type': 'undo', 'id': stroke_id})
+            return ops
@@ -0,0 +1,119 @@
+"""Per-room chat aggregation so guess storms don't flood the room with emits"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+# Window (ms) over which chat messages in a room are merged into one frame; 0 disables batching
+CHAT_BATCH_MS = float(os.environ.get('PAINTIT_CHAT_BATCH_MS', 100))
+# A room's batch is sent early once it holds this many messages
+CHAT_BATCH_MAX = int(os.environ.get('PAINTIT_CHAT_BATCH_MAX', 50))
+
+class ChatBatcher:
+    """Collects chat messages per room and emits them as one chat_batch frame per window.
+
+    Only chat goes through here. Game events (correct_guess, round_end, hints...)
+    are broadcast directly, so they are never queued behind a pending batch.
+    Batches are flushed by the batcher's own thread, which sleeps until the
+    earliest window closes, so chat never delays round timers. A batch that
+    reaches `max_batch` messages is sent right away by the posting handler.
+    """
+
+    def __init__(self, broadcast: Callable[[str, str, dict], None], window_ms: float = CHAT_BATCH_MS,
+                 max_batch: int = CHAT_BATCH_MAX):
+        self.broadcast = broadcast
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.pending: Dict[str, List[dict]] = {}
+        self.deadlines = []  # heap of (due, order, room id, batch)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        # Metrics
+        self.messages = 0
+        self.batches = 0
+        self.max_batch_size = 0
+        self.early_flushes = 0
+        self.batch_size_counts: Dict[int, int] = {}
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def post(self, room_id: str, message: dict):
+        """Queue a chat message for the room, flushing after the batch window"""
+        if self.window <= 0:
+            self.broadcast(room_id, 'new_message', message)
+            return
+
+        with self._lock:
+            self.messages += 1
+            queue = self.pending.get(room_id)
+            if queue is None:
+                queue = self.pending[room_id] = []
+                entry = (time.monotonic() + self.window, next(self._order), room_id, queue)
+                heapq.heappush(self.deadlines, entry)
+                self._ensure_running()
+                if self.deadlines[0] is entry:
+                    self._wakeup.notify()
+            queue.append(message)
+            if len(queue) < self.max_batch:
+                return
+            self.early_flushes += 1
+            messages = self._take(room_id, queue)
+        self.broadcast(room_id, 'chat_batch', {'messages': messages})
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self.deadlines:
+                    self._wakeup.wait()
+                    continue
+                wait = self.deadlines[0][0] - time.monotonic()
+                if wait > 0:
+                    self._wakeup.wait(wait)
+                    continue
+                _, _, room_id, queue = heapq.heappop(self.deadlines)
+            self.flush(room_id, queue)
+
+    def _take(self, room_id: str, batch: List[dict] = None) -> List[dict]:
+        """Remove a room's pending batch and count it (lock held).
+        If batch is given, only take it when it's still the room's pending batch"""
+        messages = self.pending.get(room_id)
+        if not messages or (batch is not None and messages is not batch):
+            return []
+        del self.pending[room_id]
+        size = len(messages)
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+        return messages
+
+    def flush(self, room_id: str, batch: List[dict] = None):
+        """Emit everything queued for a room as one frame"""
+        with self._lock:
+            messages = self._take(room_id, batch)
+        if messages:
+            self.broadcast(room_id, 'chat_batch', {'messages': messages})
+
+    def snapshot(self) -> dict:
+        """Batch size and emit reduction statistics"""
+        with self._lock:
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch': self.max_batch,
+                'messages': self.messages,
+                'batches': self.batches,
+                'pending_rooms': len(self.pending),
+                'avg_batch_size': round(self.messages / self.batches, 2) if self.batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'early_flushes': self.early_flushes,
+                'batch_size_counts': dict(sorted(self.batch_size_counts.items())),
+                # Room broadcasts avoided; each one also fans out to every player
+                'emits_saved': self.messages - self.batches - sum(len(q) for q in self.pending.values())
+            }
@@ -0,0 +1,45 @@
+"""Game clock that the replayer can run faster than real time"""
+
+import threading
+import time
+
+class GameClock:
+    """Wall and monotonic time for game logic, scaled by `speed`.
+
+    Round timers, hints, the gap between rounds, the resume grace period and
+    guess scoring all read this clock. At speed N a 60 s round lasts 60/N real
+    seconds, so a recording replayed at N x still lands in the same rounds.
+    """
+
+    def __init__(self):
+        self.speed = 1.0
+        self._real_base = time.monotonic()
+        self._game_base = self._real_base
+        self._wall_offset = time.time() - self._real_base
+        self._lock = threading.Lock()
+
+    def set_speed(self, speed: float):
+        """Change how fast game time runs, continuing from the current game time"""
+        if speed <= 0:
+            raise ValueError('speed must be positive')
+        with self._lock:
+            real_now = time.monotonic()
+            self._game_base += (real_now - self._real_base) * self.speed
+            self._real_base = real_now
+            self.speed = speed
+
+    def monotonic(self) -> float:
+        """Game time in seconds for measuring intervals"""
+        with self._lock:
+            return self._game_base + (time.monotonic() - self._real_base) * self.speed
+
+    def time(self) -> float:
+        """Game time as a Unix timestamp"""
+        return self.monotonic() + self._wall_offset
+
+    def real_seconds(self, game_seconds: float) -> float:
+        """How many real seconds a span of game time takes"""
+        return game_seconds / self.speed
+
+# Global clock shared by the game manager and its scheduler
+game_clock = GameClock()
@@ -1,12 +1,24 @@
 """Game state management: rooms, turns, scoring"""
 
-from typing import Dict, Optional, Tuple, Callable
+from typing import Dict, List, Optional, Tuple, Callable
+import heapq
+import os
 import random
-import time
+import secrets
 import threading
 from difflib import SequenceMatcher
-from server.models import GameState, Player, GameStateEnum
+from server.models import GameState, Player, GameStateEnum, MAX_PLAYERS
 from server.words import get_random_word
+from server.load import load_monitor
+from server.matchmaking import RoomIndex
+from server.scheduler import RoundTicker
+from server.chat import ChatBatcher
+from server.clock import game_clock
+
+# Seconds a disconnected player is kept so they can resume their session
+RESUME_GRACE = float(os.environ.get('PAINTIT_RESUME_GRACE', 20))
+# Seconds a quick-play seat is held for a player who hasn't joined yet
+RESERVATION_TTL = 30
 
 class GameManager:
     """Manages all game rooms and their states"""
@@ -14,6 +26,12 @@ class GameManager:
     def __init__(self):
         self.rooms: Dict[str, GameState] = {}
         self.socketio = None  # Will be set from app.py
+        self.room_index = RoomIndex(MAX_PLAYERS)
+        self._index_lock = threading.RLock()
+        self._reservation_expiry = []  # heap of (expires_at, room_id, player_name)
+        self._reservations: Dict[str, str] = {}  # player name -> room id of their quick-play seat
+        self.ticker = RoundTicker(interval=0.5, on_drift=load_monitor.record_timer_drift)
+        self.chat = ChatBatcher(self.broadcast)
     
     def set_socketio(self, socketio):
         """Set the socketio instance for emitting events"""
@@ -29,65 +47,305 @@ class GameManager:
         """Get room by ID"""
         return self.rooms.get(room_id)
     
-    def add_player(self, room_id: str, player_name: str, socket_id: str) -> Tuple[bool, bool]:
-        """Add a player to a room. Returns (success, is_host)"""
-        room = self.create_or_get_room(room_id)
-        
-        # Check if name is already taken in this room
-        if player_name in room.players:
-            # If same socket, allow reconnection
-            if room.players[player_name].socket_id == socket_id:
-                room.players[player_name].socket_id = socket_id  # Update socket
-                return True, room.players[player_name].is_host
-            return False, False
-        
-        # First player becomes host
-        is_first_player = len(room.players) == 0
-        is_host = is_first_player
-        
-        room.players[player_name] = Player(
-            name=player_name, 
-            socket_id=socket_id,
-            is_host=is_host
-        )
-        return True, is_host
+    def update_room_index(self, room_id: str):
+        """Re-bucket a room in the quick-play index after a join, leave or state change"""
+        with self._index_lock:
+            room = self.get_room(room_id)
+            if not room:
+                self.room_index.remove(room_id)
+                return
+            self.room_index.update(
+                room_id,
+                room.word_category,
+                room.free_seats(),
+                room.is_public and room.game_state == GameStateEnum.WAITING
+            )
     
-    def remove_player(self, room_id: str, socket_id: str) -> Optional[str]:
-        """Remove a player from a room. Returns player name if removed"""
+    def _new_room_id(self) -> str:
+        """Generate an unused 6-digit room ID"""
+        while True:
+            room_id = str(random.randint(100000, 999999))
+            if room_id not in self.rooms:
+                return room_id
+    
+    def _expire_reservations(self):
+        """Release quick-play seats whose players never joined"""
+        now = game_clock.time()
+        while self._reservation_expiry and self._reservation_expiry[0][0] <= now:
+            expires_at, room_id, player_name = heapq.heappop(self._reservation_expiry)
+            room = self.get_room(room_id)
+            if not room or room.reserved_seats.get(player_name) != expires_at:
+                continue
+            self._release_reservation(room, player_name)
+    
+    def _sweep_reservations(self):
+        """Scheduled after each reservation so unused seats and empty rooms go away"""
+        with self._index_lock:
+            self._expire_reservations()
+    
+    def _release_reservation(self, room: GameState, player_name: str):
+        """Drop a player's reserved seat, deleting the room if nothing is left in it (lock held)"""
+        del room.reserved_seats[player_name]
+        if self._reservations.get(player_name) == room.room_id:
+            del self._reservations[player_name]
+        if not room.players and not room.reserved_seats:
+            self.rooms.pop(room.room_id, None)
+        self.update_room_index(room.room_id)
+    
+    def list_open_rooms(self, category: str = None, limit: int = 50) -> List[dict]:
+        """Open public rooms in a category, fullest first"""
+        with self._index_lock:
+            return self.room_index.open_rooms(category, limit)
+    
+    def quick_play(self, player_name: str, category: str = None) -> str:
+        """Reserve a seat in the fullest open public room, creating one if needed.
+        A player who already holds a seat in that category keeps it. Returns the room ID"""
+        with self._index_lock:
+            self._expire_reservations()
+            
+            # Repeat clicks (double submit, back button) get the seat they already have
+            reserved_room = self.get_room(self._reservations.get(player_name))
+            if reserved_room:
+                if reserved_room.word_category == category:
+                    return reserved_room.room_id
+                self._release_reservation(reserved_room, player_name)
+            
+            # Skip rooms where this name is already taken
+            skipped = set()
+            room_id = self.room_index.find(category)
+            while room_id:
+                room = self.rooms.get(room_id)
+                if room is None:
+                    self.room_index.remove(room_id)  # Stale entry
+                elif player_name not in room.players and player_name not in room.reserved_seats:
+                    break
+                skipped.add(room_id)
+                room_id = self.room_index.find(category, exclude=skipped)
+            
+            if not room_id:
+                room_id = self._new_room_id()
+                room = self.create_or_get_room(room_id)
+                room.is_public = True
+                room.word_category = category
+            
+            expires_at = game_clock.time() + RESERVATION_TTL
+            room.reserved_seats[player_name] = expires_at
+            self._reservations[player_name] = room_id
+            heapq.heappush(self._reservation_expiry, (expires_at, room_id, player_name))
+            self.update_room_index(room_id)
+        self.ticker.call_later(RESERVATION_TTL, self._sweep_reservations)
+        return room_id
+    
+    def broadcast(self, room_id: str, event: str, data: dict, skip_sid: str = None):
+        """Emit an event to a room, numbering and buffering it for session resume.
+        The sender skipped via skip_sid is remembered so a resume doesn't echo it back"""
+        room = self.get_room(room_id)
+        payload = dict(data)
+        if room:
+            sender = room.get_player_by_socket(skip_sid) if skip_sid else None
+            with room.event_lock:
+                room.event_seq += 1
+                payload['seq'] = room.event_seq
+                room.event_log.append((room.event_seq, event, payload, sender.name if sender else None))
+        if self.socketio:
+            self.socketio.emit(event, payload, room=room_id, skip_sid=skip_sid)
+    
+    def get_missed_events(self, room_id: str, last_seq: int,
+                          player_name: str = None) -> Optional[List[tuple]]:
+        """Get buffered (seq, event, payload) after last_seq, or None if they're no longer buffered.
+        Events the player sent themselves (and was skipped for) are left out"""
         room = self.get_room(room_id)
         if not room:
             return None
         
-        # Find player by socket_id
-        player_to_remove = None
-        for name, player in room.players.items():
-            if player.socket_id == socket_id:
-                player_to_remove = name
-                break
-        
-        if player_to_remove:
-            was_host = room.players[player_to_remove].is_host
-            del room.players[player_to_remove]
+        with room.event_lock:
+            if last_seq >= room.event_seq:
+                return []
+            oldest_seq = room.event_log[0][0] if room.event_log else room.event_seq + 1
+            if last_seq + 1 < oldest_seq:
+                return None
+            return [(seq, event, payload) for seq, event, payload, sender in room.event_log
+                    if seq > last_seq and (sender is None or sender != player_name)]
+    
+    def add_player(self, room_id: str, player_name: str, socket_id: str,
+                   resume_token: str = None) -> Tuple[bool, bool, Optional[str]]:
+        """Add a player to a room. Returns (success, is_host, error message).
+        Runs under the index lock so concurrent joins can't overfill a room"""
+        with self._index_lock:
+            self._expire_reservations()
+            room = self.create_or_get_room(room_id)
             
-            # If host left, assign new host (first remaining player)
-            if was_host and len(room.players) > 0:
-                first_player = list(room.players.values())[0]
-                first_player.is_host = True
+            # Check if name is already taken in this room
+            if player_name in room.players:
+                player = room.players[player_name]
+                # If same socket or a valid resume token, allow reconnection
+                if player.socket_id == socket_id or (resume_token and resume_token == player.resume_token):
+                    player.socket_id = socket_id  # Update socket
+                    player.connected = True
+                    return True, player.is_host, None
+                return False, False, 'Player name already taken in this room'
             
-            # If drawer left, end the round
-            if room.current_drawer == player_to_remove:
-                room.current_drawer = None
-                room.current_word = None
-                if room.hint_timer:
-                    room.hint_timer.cancel()
+            # A quick-play reservation becomes a real seat; otherwise a seat must be free
+            if room.reserved_seats.pop(player_name, None) is None and room.free_seats() <= 0:
+                return False, False, 'Room is full'
+            if self._reservations.get(player_name) == room_id:
+                del self._reservations[player_name]
             
-            # If no players left, cleanup room
-            if len(room.players) == 0:
-                del self.rooms[room_id]
+            # First player becomes host
+            is_first_player = len(room.players) == 0
+            is_host = is_first_player
             
-            return player_to_remove
+            room.players[player_name] = Player(
+                name=player_name, 
+                socket_id=socket_id,
+                is_host=is_host,
+                resume_token=secrets.token_urlsafe(16)
+            )
+            self.update_room_index(room_id)
+            return True, is_host, None
+    
+    def resume_player(self, room_id: str, resume_token: str, socket_id: str) -> Optional[Player]:
+        """Reattach a player to a new socket using their resume token"""
+        room = self.get_room(room_id)
+        if not room or not resume_token:
+            return None
+        
+        for player in room.players.values():
+            if player.resume_token == resume_token:
+                player.socket_id = socket_id
+                player.connected = True
+                return player
         return None
     
+    def disconnect_player(self, room_id: str, socket_id: str) -> Optional[str]:
+        """Mark a player disconnected and remove them if they don't resume in time.
+        Returns player name if the socket belonged to this room"""
+        room = self.get_room(room_id)
+        if not room:
+            return None
+        
+        player = room.get_player_by_socket(socket_id)
+        if not player:
+            return None
+        
+        player.connected = False
+        if RESUME_GRACE > 0:
+            self.ticker.call_later(RESUME_GRACE, lambda: self.expire_player(room_id, socket_id))
+        else:
+            self.expire_player(room_id, socket_id)
+        return player.name
+    
+    def expire_player(self, room_id: str, socket_id: str):
+        """Remove a disconnected player unless they resumed on a new socket"""
+        room = self.get_room(room_id)
+        if not room:
+            return
+        
+        player = room.get_player_by_socket(socket_id)
+        if not player or player.connected:
+            return
+        
+        player_name = self.remove_player(room_id, socket_id)
+        if player_name and self.get_room(room_id):  # Room still exists
+            self.broadcast(room_id, 'player_left', {'player': player_name})
+            players_data = [p.to_dict() for p in room.players.values()]
+            self.broadcast(room_id, 'update_player_list', {'players': players_data})
+    
+    def remove_player(self, room_id: str, socket_id: str) -> Optional[str]:
+        """Remove a player from a room. Returns player name if removed"""
+        with self._index_lock:
+            room = self.get_room(room_id)
+            if not room:
+                return None
+            
+            # Find player by socket_id
+            player_to_remove = None
+            for name, player in room.players.items():
+                if player.socket_id == socket_id:
+                    player_to_remove = name
+                    break
+            
+            if player_to_remove:
+                was_host = room.players[player_to_remove].is_host
+                del room.players[player_to_remove]
+                
+                # If host left, assign new host (first remaining player)
+                if was_host and len(room.players) > 0:
+                    first_player = list(room.players.values())[0]
+                    first_player.is_host = True
+                
+                # If drawer left, end the round
+                if room.current_drawer == player_to_remove:
+                    room.current_drawer = None
+                    room.current_word = None
+                    if room.hint_timer:
+                        room.hint_timer.cancel()
+                
+                # If no players left and no quick-play seats are on the way, cleanup room
+                if not room.players and not room.reserved_seats:
+                    del self.rooms[room_id]
+                self.update_room_index(room_id)
+                
+                return player_to_remove
+            return None
+    
+    def create_rooms(self, count: int, max_rounds: int = 5, category: str = None,
+                     is_public: bool = False) -> List[str]:
+        """Create many empty rooms with the same settings. Returns their IDs"""
+        room_ids = []
+        with self._index_lock:
+            for _ in range(count):
+                room_id = self._new_room_id()
+                room = self.create_or_get_room(room_id)
+                room.max_rounds = max_rounds
+                room.word_category = category
+                room.is_public = is_public
+                self.update_room_index(room_id)
+                room_ids.append(room_id)
+        return room_ids
+    
+    def start_games(self, room_ids: List[str], stagger: float = 0.0) -> Tuple[List[str], List[str]]:
+        """Start many games, spreading the starts evenly over `stagger` seconds
+        so their round timers and hints don't all fire together.
+        Returns (scheduled, skipped) room IDs"""
+        scheduled, skipped = [], []
+        for room_id in room_ids:
+            room = self.get_room(room_id)
+            if room and len(room.players) >= 2 and room.game_state == GameStateEnum.WAITING:
+                scheduled.append(room_id)
+            else:
+                skipped.append(room_id)
+        
+        for i, room_id in enumerate(scheduled):
+            delay = stagger * i / len(scheduled)
+            self.ticker.call_later(delay, lambda room_id=room_id: self._start_scheduled_game(room_id))
+        return scheduled, skipped
+    
+    def _start_scheduled_game(self, room_id: str):
+        """Start a game on the scheduler thread and announce it like a host start"""
+        if self.start_game(room_id):
+            self.broadcast(room_id, 'game_started', self.get_game_state(room_id))
+    
+    def shutdown_rooms(self, room_ids: List[str], message: str = 'This room has been closed') -> int:
+        """Stop games, notify players and delete rooms. Returns number of rooms closed"""
+        closed = 0
+        for room_id in room_ids:
+            room = self.get_room(room_id)
+            if not room:
+                continue
+            if room.hint_timer:
+                room.hint_timer.cancel()
+                room.hint_timer = None
+            room.game_state = GameStateEnum.FINISHED
+            if self.socketio:
+                self.socketio.emit('room_closed', {'message': message}, room=room_id)
+                self.socketio.close_room(room_id)
+            with self._index_lock:
+                self.rooms.pop(room_id, None)
+                self.update_room_index(room_id)
+            closed += 1
+        return closed
+    
     def start_game(self, room_id: str) -> bool:
         """Start the game in a room"""
         room = self.get_room(room_id)
@@ -99,7 +357,8 @@ class GameManager:
         
         room.game_state = GameStateEnum.IN_PROGRESS
         room.current_round = 1
-        self.start_round(room_id)
+        self.update_room_index(room_id)
+        self.start_round(room_id, room.word_category)
         return True
     
     def start_round(self, room_id: str, category: str = None) -> bool:
@@ -129,20 +388,21 @@ class GameManager:
         drawer.is_drawer = True
         
         room.current_word = get_random_word(category)
-        room.round_start_time = time.time()
+        room.round_start_time = game_clock.time()
         room.round_timer = 60
         room.revealed_letters = 0
         room.reset_guesses()
         room.word_category = category
+        room.canvas.clear()
         
         # Emit round start event
         if self.socketio:
-            self.socketio.emit('round_start', {
+            self.broadcast(room_id, 'round_start', {
                 'drawer': room.current_drawer,
                 'word_length': len(room.current_word),
                 'round': room.current_round,
                 'max_rounds': room.max_rounds
-            }, room=room_id)
+            })
             
             # Send word to drawer only
             self.socketio.emit('your_word', {'word': room.current_word}, room=drawer.socket_id)
@@ -158,55 +418,59 @@ class GameManager:
         if not room:
             return
         
-        def timer_loop():
-            start_time = time.time()
-            elapsed = 0
+        start_time = game_clock.time()
+        last_second = None
+        
+        def tick() -> bool:
+            nonlocal last_second
+            if room.game_state != GameStateEnum.IN_PROGRESS:
+                return False
             
-            while elapsed < 60 and room.game_state == GameStateEnum.IN_PROGRESS:
-                elapsed = time.time() - start_time
-                time_left = max(0, 60 - elapsed)
-                room.round_timer = int(time_left)
-                
-                if self.socketio:
-                    # Emit timer update
-                    self.socketio.emit('timer_update', {'time_left': int(time_left)}, room=room_id)
-                    
-                    # Hint at 30s (first letter)
-                    if 29 <= time_left <= 30 and room.revealed_letters == 0:
-                        room.revealed_letters = 1
-                        self.socketio.emit('hint', {
-                            'type': 'first_letter',
-                            'letter': room.current_word[0],
-                            'word_display': room.get_word_display()
-                        }, room=room_id)
-                    
-                    # Hint at 15s (last letter)
-                    elif 14 <= time_left <= 15 and room.revealed_letters == 1:
-                        room.revealed_letters = 2
-                        self.socketio.emit('hint', {
-                            'type': 'last_letter',
-                            'letter': room.current_word[-1],
-                            'word_display': room.get_word_display()
-                        }, room=room_id)
-                    
-                    # Hint at 10s (pattern with first and last)
-                    elif 9 <= time_left <= 10 and room.revealed_letters == 2:
-                        self.socketio.emit('hint', {
-                            'type': 'pattern',
-                            'pattern': room.get_word_display(),
-                            'word_display': room.get_word_display()
-                        }, room=room_id)
-                
-                time.sleep(0.5)  # Update every 500ms
+            elapsed = game_clock.time() - start_time
+            time_left = max(0, 60 - elapsed)
+            room.round_timer = int(time_left)
             
-            # Time's up
-            if room.game_state == GameStateEnum.IN_PROGRESS:
+            if elapsed >= 60:
+                # Time's up
                 self.end_round(room_id)
-        
-        # Start timer in background thread
-        timer_thread = threading.Thread(target=timer_loop, daemon=True)
-        timer_thread.start()
-        room.hint_timer = timer_thread
+                return False
+            
+            if self.socketio:
+                # Emit timer update only when the shown second changes
+                # (not buffered for resume: the next tick supersedes it)
+                if int(time_left) != last_second:
+                    last_second = int(time_left)
+                    self.socketio.emit('timer_update', {'time_left': last_second}, room=room_id)
+                
+                # Hint at 30s (first letter)
+                if 29 <= time_left <= 30 and room.revealed_letters == 0:
+                    room.revealed_letters = 1
+                    self.broadcast(room_id, 'hint', {
+                        'type': 'first_letter',
+                        'letter': room.current_word[0],
+                        'word_display': room.get_word_display()
+                    })
+                
+                # Hint at 15s (last letter)
+                elif 14 <= time_left <= 15 and room.revealed_letters == 1:
+                    room.revealed_letters = 2
+                    self.broadcast(room_id, 'hint', {
+                        'type': 'last_letter',
+                        'letter': room.current_word[-1],
+                        'word_display': room.get_word_display()
+                    })
+                
+                # Hint at 10s (pattern with first and last)
+                elif 9 <= time_left <= 10 and room.revealed_letters == 2:
+                    self.broadcast(room_id, 'hint', {
+                        'type': 'pattern',
+                        'pattern': room.get_word_display(),
+                        'word_display': room.get_word_display()
+                    })
+            return True
+        
+        # Tick with every other round on the shared scheduler (every 500ms)
+        room.hint_timer = self.ticker.register_round(room_id, tick)
     
     def check_guess(self, room_id: str, player_name: str, guess: str) -> dict:
         """Check if a guess is correct. Returns result dict"""
@@ -240,12 +504,12 @@ class GameManager:
         
         if is_correct:
             # Calculate points: base 100 + (time_left * 2)
-            elapsed = time.time() - room.round_start_time
+            elapsed = game_clock.time() - room.round_start_time
             time_left = max(0, 60 - elapsed)
             points = int(100 + (time_left * 2))
             
             player.has_guessed = True
-            player.guess_time = time.time()
+            player.guess_time = game_clock.time()
             player.score += points
             
             # Drawer gets bonus (50% of points)
@@ -279,7 +543,7 @@ class GameManager:
         
         # Stop timer
         if room.hint_timer:
-            room.hint_timer.join(timeout=0.1)
+            room.hint_timer.cancel()
             room.hint_timer = None
         
         results = {
@@ -291,7 +555,7 @@ class GameManager:
         
         # Emit round end
         if self.socketio:
-            self.socketio.emit('round_end', results, room=room_id)
+            self.broadcast(room_id, 'round_end', results)
         
         # Reset flags
         room.reset_guesses()
@@ -300,8 +564,7 @@ class GameManager:
         if room.current_round < room.max_rounds:
             room.current_round += 1
             # Small delay before next round
-            import threading
-            threading.Timer(3.0, lambda: self.start_round(room_id, room.word_category)).start()
+            self.ticker.call_later(3.0, lambda: self.start_round(room_id, room.word_category))
         else:
             self.end_game(room_id)
         
@@ -314,6 +577,7 @@ class GameManager:
             return
         
         room.game_state = GameStateEnum.FINISHED
+        self.update_room_index(room_id)
         
         # Find winner
         winner = max(room.players.values(), key=lambda p: p.score)
@@ -325,11 +589,11 @@ class GameManager:
         )]
         
         if self.socketio:
-            self.socketio.emit('game_over', {
+            self.broadcast(room_id, 'game_over', {
                 'winner': winner.name,
                 'winner_score': winner.score,
                 'final_scores': final_scores
-            }, room=room_id)
+            })
     
     def get_game_state(self, room_id: str) -> Optional[dict]:
         """Get current game state for a room"""
@@ -339,7 +603,7 @@ class GameManager:
         
         elapsed = 0
         if room.round_start_time:
-            elapsed = time.time() - room.round_start_time
+            elapsed = game_clock.time() - room.round_start_time
         
         time_remaining = max(0, 60 - elapsed)
         
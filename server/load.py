@@ -0,0 +1,116 @@
+"""Server lag measurement and admission control"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+# Lag (ms) above which new rooms and joins are rejected
+SHED_LAG_MS = float(os.environ.get('PAINTIT_SHED_LAG_MS', 250))
+# Lag (ms) below which admission resumes (hysteresis so we don't flap)
+RECOVER_LAG_MS = float(os.environ.get('PAINTIT_RECOVER_LAG_MS', SHED_LAG_MS / 2))
+
+class LoadMonitor:
+    """Tracks how far behind the server is running and decides when to shed load.
+
+    Two signals feed the lag estimate:
+    - scheduler lag: a probe thread sleeps for a fixed interval and measures how
+      late it wakes up. This is the delay a queued socket handler waits before
+      it gets to run.
+    - timer drift: GameManager round timers report how late each tick fired.
+    Both are smoothed with an exponential moving average. When no timer has
+    reported for `drift_stale_after` seconds, the probe decays timer drift
+    toward zero so an old spike can't keep the server shedding.
+    """
+
+    def __init__(self, shed_lag_ms: float = SHED_LAG_MS, recover_lag_ms: float = RECOVER_LAG_MS,
+                 probe_interval: float = 0.1, smoothing: float = 0.2, drift_stale_after: float = 1.0):
+        self.shed_lag_ms = shed_lag_ms
+        self.recover_lag_ms = recover_lag_ms
+        self.probe_interval = probe_interval
+        self.smoothing = smoothing
+        self.drift_stale_after = drift_stale_after
+        self._last_drift_sample = time.monotonic()
+        self.scheduler_lag_ms = 0.0
+        self.timer_drift_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.shedding = False
+        self.shed_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._probe = None
+
+    def start(self):
+        """Start the background scheduler-lag probe (idempotent)"""
+        if self._probe:
+            return
+        self._probe = threading.Thread(target=self._probe_loop, daemon=True)
+        self._probe.start()
+
+    def _probe_loop(self):
+        while True:
+            before = time.monotonic()
+            time.sleep(self.probe_interval)
+            late = time.monotonic() - before - self.probe_interval
+            self.record_scheduler_lag(max(0.0, late))
+            if time.monotonic() - self._last_drift_sample > self.drift_stale_after:
+                self._decay_timer_drift()
+
+    def _smooth(self, current: float, sample_ms: float) -> float:
+        return current + self.smoothing * (sample_ms - current)
+
+    def record_scheduler_lag(self, seconds: float):
+        """Record how late the probe thread woke up"""
+        with self._lock:
+            self.scheduler_lag_ms = self._smooth(self.scheduler_lag_ms, seconds * 1000)
+            self._update()
+
+    def record_timer_drift(self, seconds: float):
+        """Record how late a game timer tick fired"""
+        with self._lock:
+            self._last_drift_sample = time.monotonic()
+            self.timer_drift_ms = self._smooth(self.timer_drift_ms, max(0.0, seconds) * 1000)
+            self._update()
+    
+    def _decay_timer_drift(self):
+        """Pull timer drift toward zero while no timers are reporting"""
+        with self._lock:
+            self.timer_drift_ms = self._smooth(self.timer_drift_ms, 0.0)
+            self._update()
+
+    def _update(self):
+        lag = self.lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag)
+        if self.shedding:
+            self.shedding = lag > self.recover_lag_ms
+        else:
+            self.shedding = lag > self.shed_lag_ms
+
+    @property
+    def lag_ms(self) -> float:
+        """Current lag estimate in milliseconds"""
+        return max(self.scheduler_lag_ms, self.timer_drift_ms)
+
+    def admit(self, kind: str) -> bool:
+        """Return True if new work of this kind may be admitted, counting sheds"""
+        if not self.shedding:
+            return True
+        with self._lock:
+            self.shed_counts[kind] = self.shed_counts.get(kind, 0) + 1
+        return False
+
+    def snapshot(self) -> dict:
+        """Current lag and shed statistics"""
+        with self._lock:
+            return {
+                'lag_ms': round(self.lag_ms, 2),
+                'scheduler_lag_ms': round(self.scheduler_lag_ms, 2),
+                'timer_drift_ms': round(self.timer_drift_ms, 2),
+                'max_lag_ms': round(self.max_lag_ms, 2),
+                'shedding': self.shedding,
+                'shed_lag_ms': self.shed_lag_ms,
+                'recover_lag_ms': self.recover_lag_ms,
+                'shed_counts': dict(self.shed_counts)
+            }
+
+# Global load monitor instance
+load_monitor = LoadMonitor()
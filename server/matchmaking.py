@@ -0,0 +1,62 @@
+"""Index of open public rooms for quick-play matchmaking"""
+
+from typing import Dict, List, Optional, Tuple
+
+class RoomIndex:
+    """Open WAITING rooms bucketed by (category, free seats).
+
+    Buckets are insertion-ordered dicts used as ordered sets, so adding,
+    moving and removing a room is O(1). Finding the fullest joinable room
+    checks at most max_players buckets, independent of the number of rooms.
+    """
+
+    def __init__(self, max_players: int):
+        self.max_players = max_players
+        self.buckets: Dict[Tuple[Optional[str], int], Dict[str, None]] = {}
+        self.keys: Dict[str, Tuple[Optional[str], int]] = {}  # room id -> current bucket key
+
+    def update(self, room_id: str, category: Optional[str], free_seats: int, joinable: bool):
+        """Move a room to the bucket matching its state, or drop it if not joinable"""
+        key = (category, free_seats) if joinable and free_seats > 0 else None
+        old_key = self.keys.get(room_id)
+        if key == old_key:
+            return
+
+        if old_key is not None:
+            bucket = self.buckets[old_key]
+            del bucket[room_id]
+            if not bucket:
+                del self.buckets[old_key]
+            del self.keys[room_id]
+
+        if key is not None:
+            self.buckets.setdefault(key, {})[room_id] = None
+            self.keys[room_id] = key
+
+    def remove(self, room_id: str):
+        """Drop a room from the index"""
+        self.update(room_id, None, 0, False)
+
+    def find(self, category: Optional[str] = None, exclude=()) -> Optional[str]:
+        """Return the fullest open room in a category, oldest first within a bucket"""
+        for free_seats in range(1, self.max_players + 1):
+            bucket = self.buckets.get((category, free_seats))
+            if not bucket:
+                continue
+            for room_id in bucket:
+                if room_id not in exclude:
+                    return room_id
+        return None
+
+    def open_rooms(self, category: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """List open rooms in a category, fullest first"""
+        rooms = []
+        for free_seats in range(1, self.max_players + 1):
+            for room_id in self.buckets.get((category, free_seats), ()):
+                if len(rooms) >= limit:
+                    return rooms
+                rooms.append({'room_id': room_id, 'category': category, 'free_seats': free_seats})
+        return rooms
+
+    def __len__(self) -> int:
+        return len(self.keys)
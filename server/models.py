@@ -1,9 +1,17 @@
 """Data models for players, rooms, and game state"""
 
+import threading
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
+from server.canvas import CanvasLog
+
+# Number of recent room events kept for reconnecting clients
+EVENT_LOG_SIZE = 512
+# Seats per room
+MAX_PLAYERS = 8
 
 class GameStateEnum(str, Enum):
     """Game state enumeration"""
@@ -22,6 +30,8 @@ class Player:
     guess_time: Optional[float] = None
     avatar: Optional[str] = None
     is_host: bool = False  # First player is host
+    resume_token: Optional[str] = None  # Lets a reconnecting client reclaim this player
+    connected: bool = True
     
     def to_dict(self) -> dict:
         """Convert player to dictionary"""
@@ -39,6 +49,9 @@ class GameState:
     """Represents the state of a game room"""
     room_id: str
     players: Dict[str, Player] = field(default_factory=dict)
+    max_players: int = MAX_PLAYERS
+    is_public: bool = False  # Listed for quick play
+    reserved_seats: Dict[str, float] = field(default_factory=dict)  # Quick-play player name -> expiry time
     current_drawer: Optional[str] = None
     current_word: Optional[str] = None
     current_round: int = 0
@@ -48,13 +61,21 @@ class GameState:
     game_state: GameStateEnum = GameStateEnum.WAITING
     word_category: Optional[str] = None
     revealed_letters: int = 0  # Number of letters revealed via hints
-    hint_timer: Optional[object] = None  # Timer thread for hints
+    hint_timer: Optional[object] = None  # Scheduler handle for the round timer
     canvas_data: Optional[dict] = None
+    canvas: CanvasLog = field(default_factory=CanvasLog)  # Drawing ops for the current round
+    event_seq: int = 0  # Sequence number of the last buffered room event
+    event_log: deque = field(default_factory=lambda: deque(maxlen=EVENT_LOG_SIZE))
+    event_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
     def get_player_list(self) -> List[str]:
         """Get list of player names"""
         return list(self.players.keys())
     
+    def free_seats(self) -> int:
+        """Seats not taken by players or quick-play reservations"""
+        return self.max_players - len(self.players) - len(self.reserved_seats)
+    
     def get_host(self) -> Optional[Player]:
         """Get the host player (first player)"""
         for player in self.players.values():
@@ -0,0 +1,192 @@
+"""Opt-in recorder for inbound socket traffic"""
+
+import atexit
+import functools
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import List, Optional
+
+# Set PAINTIT_RECORD=<path> to record all handled socket events
+RECORD_ENV_VAR = "PAINTIT_RECORD"
+
+# gzip member header magic, used to resync after a damaged member
+GZIP_MAGIC = b'\x1f\x8b\x08'
+
+# Payload fields holding resume tokens, never written in plaintext
+TOKEN_FIELDS = ('token', 'resume_token')
+
+def redact_token(token: str) -> str:
+    """Stable alias for a resume token, so a replay can match it up without seeing it"""
+    return 'redacted:' + hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+def redact_tokens(data: dict) -> dict:
+    """Return data with any resume token fields replaced by their alias"""
+    if not any(isinstance(data.get(key), str) for key in TOKEN_FIELDS):
+        return data
+    data = dict(data)
+    for key in TOKEN_FIELDS:
+        if isinstance(data.get(key), str):
+            data[key] = redact_token(data[key])
+    return data
+
+class TrafficRecorder:
+    """Appends inbound socket events to a gzip-compressed JSON-lines file.
+
+    Each line is {"t": offset_seconds, "sid": socket_id, "event": name, "data": payload}.
+    Resume tokens in payloads are replaced by a hashed alias; a `_session_issued`
+    entry records the alias of each token the server hands out.
+    Handlers only enqueue entries; a writer thread encodes them and appends
+    each batch as its own complete gzip member, so a crash loses at most the
+    batch in flight and never makes earlier or later members unreadable.
+    """
+
+    def __init__(self, flush_every: int = 50, flush_interval: float = 1.0):
+        self.path: Optional[str] = None
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._queue = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self.events_recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._queue is not None
+
+    def open(self, path: str):
+        """Start recording to path (appending if it already exists)"""
+        self.close()
+        with self._lock:
+            self.path = path
+            self._start = time.monotonic()
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, args=(path, self._queue), daemon=True)
+            self._writer.start()
+            # Session header so the replayer knows where a new run begins
+            self._queue.put({'t': 0.0, 'event': '_session', 'data': {'started_at': time.time()}})
+
+    def close(self):
+        """Flush and stop recording"""
+        with self._lock:
+            if not self._queue:
+                return
+            self._queue.put(None)
+            writer = self._writer
+            self._queue = None
+            self._writer = None
+        writer.join()
+
+    def record(self, event: str, sid: Optional[str], data=None):
+        """Record a single inbound event"""
+        entries = self._queue
+        if entries is None:
+            return
+
+        entries.put({
+            't': round(time.monotonic() - self._start, 6),
+            'sid': sid,
+            'event': event,
+            'data': data if isinstance(data, dict) else {}
+        })
+        self.events_recorded += 1
+
+    def _write_loop(self, path: str, entries: queue.SimpleQueue):
+        """Drain the queue, appending one gzip member per batch"""
+        with open(path, 'ab') as f:
+            batch: List[str] = []
+            running = True
+            while running:
+                try:
+                    entry = entries.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    entry = False
+                if entry is None:
+                    running = False
+                elif entry:
+                    entry['data'] = redact_tokens(entry['data'])
+                    batch.append(json.dumps(entry, separators=(',', ':')))
+                    if len(batch) < self.flush_every:
+                        continue
+                if batch:
+                    f.write(gzip.compress(('\n'.join(batch) + '\n').encode('utf-8')))
+                    f.flush()
+                    batch = []
+
+    def track(self, event: str):
+        """Decorator recording a socket handler's event before it runs"""
+        def decorator(handler):
+            # Flask-SocketIO retries connect handlers without args on TypeError,
+            # so only pass what the handler accepts to avoid recording twice
+            arg_count = len(inspect.signature(handler).parameters)
+
+            @functools.wraps(handler)
+            def wrapper(*args):
+                if self._queue is not None:
+                    from flask import request
+                    self.record(event, getattr(request, 'sid', None), args[0] if args else None)
+                return handler(*args[:arg_count])
+            return wrapper
+        return decorator
+
+def read_recording(path: str, problems: Optional[list] = None):
+    """Yield recorded entries from a recording file, in order.
+
+    Damaged or truncated gzip members (e.g. from a killed server) are skipped
+    and described in `problems`; entries in intact members are still returned.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    pos = 0
+    while pos < len(raw):
+        # Decompress in chunks so output before a damaged spot is kept
+        decompressor = zlib.decompressobj(wbits=31)
+        chunks = []
+        damaged = False
+        offset = pos
+        while offset < len(raw) and not decompressor.eof:
+            try:
+                chunks.append(decompressor.decompress(raw[offset:offset + 65536]))
+            except zlib.error as e:
+                damaged = True
+                if problems is not None:
+                    problems.append(f'damaged gzip member at byte {pos}: {e}')
+                break
+            offset += 65536
+        text = b''.join(chunks).decode('utf-8', errors='replace')
+
+        if decompressor.eof:
+            lines = text.split('\n')
+            pos = min(offset, len(raw)) - len(decompressor.unused_data)
+        else:
+            # Keep whole lines from a truncated member, then resync on the next header
+            lines = text.split('\n')[:-1]
+            if problems is not None and not damaged:
+                problems.append(f'truncated gzip member at byte {pos}')
+            next_member = raw.find(GZIP_MAGIC, pos + 1)
+            pos = next_member if next_member != -1 else len(raw)
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                if problems is not None:
+                    problems.append('skipped unreadable line')
+
+# Global recorder instance, enabled via PAINTIT_RECORD
+traffic_recorder = TrafficRecorder()
+
+if os.environ.get(RECORD_ENV_VAR):
+    traffic_recorder.open(os.environ[RECORD_ENV_VAR])
+    atexit.register(traffic_recorder.close)
@@ -0,0 +1,151 @@
+"""Replay a traffic recording against a local in-process server.
+
+Usage:
+    python -m server.replay recording.jsonl.gz --speed 10 --seed 42
+
+Every recorded socket id gets its own Socket.IO test client, so the replay
+runs fully offline. Word selection is seeded and the game clock (round
+timers, hints, the gap between rounds, resume grace, guess scoring) runs at
+the replay speed, so the same recording and seed produce the same games at
+any speed above 0. --speed 0 sends events as fast as possible without
+scaling game time, so guesses may land in different rounds. Recorded resume tokens are redacted aliases; each is
+mapped to the token the replayed server issued for that session, so recorded
+resumes succeed. Prints throughput and per-event handler latency.
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from server.clock import game_clock
+from server.recorder import read_recording
+from server.words import seed_words
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest rank)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def replay(path: str, speed: float = 1.0, seed: int = 0) -> dict:
+    """Replay a recording. speed=0 replays as fast as possible (game time not scaled).
+    Returns stats"""
+    # Imported here so recording/seeding is set up before the app is built
+    from app import app, socketio
+
+    seed_words(seed)
+    random.seed(seed)
+    if speed > 0:
+        game_clock.set_speed(speed)
+
+    clients: Dict[str, object] = {}
+    tokens: Dict[str, str] = {}  # Recorded token alias -> token issued during replay
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    problems: List[str] = []
+    events_sent = 0
+    session_wall = None  # Wall-clock time the current recorded session started replaying
+    wall_start = time.perf_counter()
+
+    def get_client(sid):
+        if sid not in clients:
+            clients[sid] = socketio.test_client(app)
+        return clients[sid]
+
+    def issued_token(client):
+        for packet in client.get_received():
+            if packet['name'] == 'session':
+                return packet['args'][0].get('token')
+        return None
+
+    def map_tokens(data):
+        data = dict(data)
+        for key in ('token', 'resume_token'):
+            if data.get(key) in tokens:
+                data[key] = tokens[data[key]]
+        return data
+
+    for entry in read_recording(path, problems):
+        event = entry.get('event')
+        if event == '_session':
+            session_wall = None
+            continue
+        if event == '_session_issued':
+            client = clients.get(entry.get('sid') or 'anonymous')
+            alias = (entry.get('data') or {}).get('token')
+            token = issued_token(client) if client else None
+            if alias and token:
+                tokens[alias] = token
+            continue
+
+        # Keep recorded pacing, scaled by speed. Sleep until the event's absolute
+        # due time so handler time doesn't add up and slow the replay down
+        t = entry.get('t', 0.0)
+        if speed > 0:
+            if session_wall is None:
+                session_wall = time.perf_counter() - t / speed
+            delay = session_wall + t / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        sid = entry.get('sid') or 'anonymous'
+        started = time.perf_counter()
+        if event == 'connect':
+            get_client(sid)
+        elif event == 'disconnect':
+            client = clients.pop(sid, None)
+            if client and client.is_connected():
+                client.disconnect()
+        else:
+            get_client(sid).emit(event, map_tokens(entry.get('data') or {}))
+        latencies[event].append(time.perf_counter() - started)
+        events_sent += 1
+
+    elapsed = time.perf_counter() - wall_start
+    game_clock.set_speed(1.0)
+    for client in clients.values():
+        if client.is_connected():
+            client.disconnect()
+
+    return {
+        'events': events_sent,
+        'elapsed': elapsed,
+        'throughput': events_sent / elapsed if elapsed > 0 else 0.0,
+        'problems': problems,
+        'latency': {
+            event: {
+                'count': len(samples),
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p95_ms': percentile(samples, 95) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+                'max_ms': max(samples) * 1000
+            }
+            for event, samples in latencies.items()
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded Paint It traffic')
+    parser.add_argument('recording', help='Path to a PAINTIT_RECORD file')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Playback speed multiplier; game timers run at the same speed '
+                             '(0 = as fast as possible, game timing not preserved)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for word selection')
+    args = parser.parse_args()
+
+    stats = replay(args.recording, speed=args.speed, seed=args.seed)
+
+    print(f"Replayed {stats['events']} events in {stats['elapsed']:.2f}s "
+          f"({stats['throughput']:.1f} events/s)")
+    for problem in stats['problems']:
+        print(f"Warning: {problem} (partial recording)")
+    print(f"{'event':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for event, row in sorted(stats['latency'].items()):
+        print(f"{event:<16}{row['count']:>8}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+              f"{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
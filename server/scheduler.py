@@ -0,0 +1,118 @@
+"""Shared scheduler for round timers and delayed game actions"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+from server.clock import GameClock, game_clock
+
+logger = logging.getLogger(__name__)
+
+class TimerHandle:
+    """Handle for a scheduled call or a registered round timer"""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class RoundTicker:
+    """Runs every round timer and delayed action on a single background thread.
+
+    Round timers are ticked together every `interval` seconds instead of each
+    room owning a sleeping thread, so thousands of rooms cost one thread.
+    One-shot calls (next-round delays, staggered starts) sit in a heap and
+    run on the same thread when due. The thread sleeps on a condition until
+    the earliest deadline, and call_later wakes it if it adds an earlier one.
+    Deadlines and the tick interval are in game time (see GameClock), so a
+    sped-up replay runs rounds faster too. Drift is reported in real seconds.
+    """
+
+    def __init__(self, interval: float = 0.5, on_drift: Callable[[float], None] = None,
+                 clock: GameClock = game_clock):
+        self.interval = interval
+        self.on_drift = on_drift
+        self.clock = clock
+        self.rounds: Dict[str, tuple] = {}  # room id -> (handle, tick callback)
+        self.calls = []  # heap of (due, order, handle, callback)
+        self.last_tick_duration = 0.0
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def register_round(self, room_id: str, tick: Callable[[], bool]) -> TimerHandle:
+        """Call tick() every interval until it returns False or the handle is cancelled.
+        Replaces any timer already registered for the room"""
+        handle = TimerHandle()
+        with self._lock:
+            previous = self.rounds.get(room_id)
+            if previous:
+                previous[0].cancel()
+            self.rounds[room_id] = (handle, tick)
+            self._ensure_running()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run callback once after delay seconds"""
+        handle = TimerHandle()
+        with self._lock:
+            entry = (self.clock.monotonic() + delay, next(self._order), handle, callback)
+            heapq.heappush(self.calls, entry)
+            self._ensure_running()
+            if self.calls[0] is entry:
+                self._wakeup.notify()
+        return handle
+
+    def _run(self):
+        next_tick = self.clock.monotonic() + self.interval
+        while True:
+            # Run due one-shot calls, sleeping until the next call or round tick
+            with self._lock:
+                due = min(self.calls[0][0], next_tick) if self.calls else next_tick
+                wait = due - self.clock.monotonic()
+                if wait > 0:
+                    self._wakeup.wait(self.clock.real_seconds(wait))
+                    continue
+                if self.calls and self.calls[0][0] <= next_tick:
+                    _, _, handle, callback = heapq.heappop(self.calls)
+                else:
+                    handle = None
+            if handle is not None:
+                if not handle.cancelled:
+                    self._safe_call(callback)
+                continue
+
+            # Round tick
+            started = time.monotonic()
+            now = self.clock.monotonic()
+            if self.on_drift:
+                self.on_drift(self.clock.real_seconds(now - next_tick))
+            next_tick = max(next_tick + self.interval, now)
+
+            with self._lock:
+                rounds = list(self.rounds.items())
+            for room_id, (handle, tick) in rounds:
+                if handle.cancelled or not self._safe_call(tick):
+                    with self._lock:
+                        if self.rounds.get(room_id, (None,))[0] is handle:
+                            del self.rounds[room_id]
+            self.last_tick_duration = time.monotonic() - started
+
+    @staticmethod
+    def _safe_call(callback) -> bool:
+        """Run a callback so one failing room can't stop every timer"""
+        try:
+            return callback() is not False
+        except Exception:
+            logger.exception("Scheduled callback failed")
+            return False
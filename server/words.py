@@ -1,7 +1,11 @@
 """Word lists and category data for the game"""
 
+import random
 from typing import List
 
+# Shared RNG for word selection so a run can be seeded (see seed_words)
+_rng = random.Random()
+
 # Word categories
 WORDS = {
     "animals": [
@@ -49,17 +53,19 @@ WORDS = {
 
 def get_random_word(category: str = None) -> str:
     """Get a random word from a category or all words"""
-    import random
-    
     if category and category in WORDS:
-        return random.choice(WORDS[category]).upper()
+        return _rng.choice(WORDS[category]).upper()
     
     # Get random word from all categories
     all_words = []
     for words_list in WORDS.values():
         all_words.extend(words_list)
     
-    return random.choice(all_words).upper()
+    return _rng.choice(all_words).upper()
+
+def seed_words(seed) -> None:
+    """Seed word selection so games are reproducible (used by the replayer)"""
+    _rng.seed(seed)
 
 def get_categories() -> List[str]:
     """Get list of available categories"""
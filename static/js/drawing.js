@@ -1,7 +1,15 @@
 /**
  * Canvas drawing functionality with mouse and touch support
+ *
+ * Drawing is sent as compact ops grouped by stroke id:
+ *   stroke_begin / stroke_points / stroke_end  - freehand stroke
+ *   fill, rect, ellipse                        - single-op groups
+ *   undo / redo                                - toggle a whole group
  */
 
+// How often buffered ops are sent to the server (ms)
+const OP_FLUSH_INTERVAL = 40;
+
 class DrawingCanvas {
     constructor(canvasId, socket, roomId) {
         this.canvas = document.getElementById(canvasId);
@@ -12,9 +20,21 @@ class DrawingCanvas {
         this.isDrawing = false;
         this.currentColor = '#000000';
         this.currentLineWidth = 5;
+        this.currentTool = 'brush'; // brush, fill, rect, ellipse
         this.prevX = 0;
         this.prevY = 0;
         
+        // Stroke groups in drawing order: id -> {ops, undone}
+        this.groups = new Map();
+        this.undoStack = []; // Ids of our own groups, newest last
+        this.redoStack = [];
+        this.pendingOps = [];
+        this.flushTimer = null;
+        this.strokeCounter = 0;
+        this.activeStrokeId = null;
+        this.shapeStart = null;
+        this.shapeBase = null;
+        
         // Resize canvas to fit container
         this.resizeCanvas();
         window.addEventListener('resize', () => this.resizeCanvas());
@@ -43,9 +63,8 @@ class DrawingCanvas {
         this.ctx.strokeStyle = this.currentColor;
         this.ctx.lineWidth = this.currentLineWidth;
         
-        // Fill canvas with white background
-        this.ctx.fillStyle = '#FFFFFF';
-        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+        // Resizing wipes the canvas, so redraw from the op log
+        this.redrawAll();
     }
     
     setupControls() {
@@ -53,6 +72,9 @@ class DrawingCanvas {
         const brushSize = document.getElementById('brush-size');
         const brushSizeDisplay = document.getElementById('brush-size-display');
         const clearBtn = document.getElementById('clear-btn');
+        const undoBtn = document.getElementById('undo-btn');
+        const redoBtn = document.getElementById('redo-btn');
+        const toolButtons = document.querySelectorAll('[data-tool]');
         
         if (colorPicker) {
             colorPicker.addEventListener('change', (e) => {
@@ -74,6 +96,21 @@ class DrawingCanvas {
                 this.clearCanvas();
             });
         }
+        
+        if (undoBtn) {
+            undoBtn.addEventListener('click', () => this.undo());
+        }
+        
+        if (redoBtn) {
+            redoBtn.addEventListener('click', () => this.redo());
+        }
+        
+        toolButtons.forEach(button => {
+            button.addEventListener('click', () => {
+                this.currentTool = button.dataset.tool;
+                toolButtons.forEach(b => b.classList.toggle('ring-2', b === button));
+            });
+        });
     }
     
     setupEventListeners() {
@@ -108,62 +145,345 @@ class DrawingCanvas {
         const scaleY = this.canvas.height / rect.height;
         
         return {
-            x: (e.clientX - rect.left) * scaleX,
-            y: (e.clientY - rect.top) * scaleY
+            x: Math.round((e.clientX - rect.left) * scaleX),
+            y: Math.round((e.clientY - rect.top) * scaleY)
         };
     }
     
+    newStrokeId() {
+        this.strokeCounter++;
+        return `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 6)}-${this.strokeCounter}`;
+    }
+    
     startDrawing(e) {
-        this.isDrawing = true;
         const coords = this.getCoordinates(e);
+        
+        if (this.currentTool === 'fill') {
+            this.commitGroup({
+                type: 'fill',
+                id: this.newStrokeId(),
+                x: coords.x,
+                y: coords.y,
+                color: this.currentColor
+            });
+            return;
+        }
+        
+        this.isDrawing = true;
         this.prevX = coords.x;
         this.prevY = coords.y;
+        
+        if (this.currentTool === 'rect' || this.currentTool === 'ellipse') {
+            // Keep the canvas so the shape preview can be redrawn while dragging
+            this.shapeStart = coords;
+            this.shapeBase = this.ctx.getImageData(0, 0, this.canvas.width, this.canvas.height);
+            return;
+        }
+        
+        this.activeStrokeId = this.newStrokeId();
+        this.commitGroup({
+            type: 'stroke_begin',
+            id: this.activeStrokeId,
+            color: this.currentColor,
+            size: this.currentLineWidth
+        });
+        this.addStrokePoints([coords.x, coords.y]);
     }
     
     draw(e) {
         if (!this.isDrawing) return;
         
         const coords = this.getCoordinates(e);
-        const currentX = coords.x;
-        const currentY = coords.y;
         
-        // Draw on local canvas
-        this.ctx.strokeStyle = this.currentColor;
-        this.ctx.lineWidth = this.currentLineWidth;
-        this.ctx.beginPath();
-        this.ctx.moveTo(this.prevX, this.prevY);
-        this.ctx.lineTo(currentX, currentY);
-        this.ctx.stroke();
+        if (this.shapeStart) {
+            this.ctx.putImageData(this.shapeBase, 0, 0);
+            this.renderOp(this.buildShapeOp('preview', coords));
+            return;
+        }
+        
+        this.addStrokePoints([coords.x, coords.y]);
+        this.prevX = coords.x;
+        this.prevY = coords.y;
+    }
+    
+    stopDrawing() {
+        if (!this.isDrawing) return;
+        this.isDrawing = false;
+        
+        if (this.shapeStart) {
+            const op = this.buildShapeOp(this.newStrokeId(), { x: this.prevX, y: this.prevY });
+            this.ctx.putImageData(this.shapeBase, 0, 0);
+            this.shapeStart = null;
+            this.shapeBase = null;
+            if (op.w !== 0 && op.h !== 0) {
+                this.commitGroup(op);
+            }
+            return;
+        }
+        
+        if (this.activeStrokeId) {
+            this.queueOp({ type: 'stroke_end', id: this.activeStrokeId });
+            this.activeStrokeId = null;
+            this.flushOps();
+        }
+    }
+    
+    buildShapeOp(id, coords) {
+        // Track the pointer so mouseup without a final move still has an end point
+        this.prevX = coords.x;
+        this.prevY = coords.y;
+        return {
+            type: this.currentTool,
+            id: id,
+            x: Math.min(this.shapeStart.x, coords.x),
+            y: Math.min(this.shapeStart.y, coords.y),
+            w: Math.abs(coords.x - this.shapeStart.x),
+            h: Math.abs(coords.y - this.shapeStart.y),
+            color: this.currentColor,
+            size: this.currentLineWidth,
+            filled: false
+        };
+    }
+    
+    // Start a new group of our own: apply locally and send
+    commitGroup(op) {
+        this.applyOp(op);
+        this.undoStack.push(op.id);
+        this.redoStack = [];
+        this.queueOp(op);
+        if (op.type !== 'stroke_begin') {
+            this.flushOps();
+        }
+    }
+    
+    addStrokePoints(points) {
+        const op = { type: 'stroke_points', id: this.activeStrokeId, points: points };
+        this.applyOp(op);
+        
+        // Merge into the last buffered op of the same stroke
+        const last = this.pendingOps[this.pendingOps.length - 1];
+        if (last && last.type === 'stroke_points' && last.id === op.id) {
+            last.points.push(...points);
+        } else {
+            this.queueOp({ type: 'stroke_points', id: op.id, points: points.slice() });
+        }
+    }
+    
+    queueOp(op) {
+        this.pendingOps.push(op);
+        if (!this.flushTimer) {
+            this.flushTimer = setTimeout(() => this.flushOps(), OP_FLUSH_INTERVAL);
+        }
+    }
+    
+    flushOps() {
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+        }
+        if (this.pendingOps.length === 0) return;
         
-        // Send drawing data to server
         if (this.socket && this.roomId) {
-            this.socket.emit('drawing', {
-                room: this.roomId,
-                x0: this.prevX,
-                y0: this.prevY,
-                x1: currentX,
-                y1: currentY,
-                color: this.currentColor,
-                size: this.currentLineWidth
+            this.socket.emit('draw_ops', {
+                room_id: this.roomId,
+                ops: this.pendingOps
             });
         }
+        this.pendingOps = [];
+    }
+    
+    undo() {
+        const id = this.undoStack.pop();
+        if (!id) return;
+        this.redoStack.push(id);
+        this.applyOp({ type: 'undo', id: id });
+        this.queueOp({ type: 'undo', id: id });
+        this.flushOps();
+    }
+    
+    redo() {
+        const id = this.redoStack.pop();
+        if (!id) return;
+        this.undoStack.push(id);
+        this.applyOp({ type: 'redo', id: id });
+        this.queueOp({ type: 'redo', id: id });
+        this.flushOps();
+    }
+    
+    // Record an op in the group log and draw it
+    applyOp(op) {
+        if (op.type === 'undo' || op.type === 'redo') {
+            const group = this.groups.get(op.id);
+            if (group) {
+                group.undone = op.type === 'undo';
+                this.redrawAll();
+            }
+            return;
+        }
         
-        this.prevX = currentX;
-        this.prevY = currentY;
+        let group = this.groups.get(op.id);
+        if (!group) {
+            group = { ops: [], undone: false, lastX: null, lastY: null };
+            this.groups.set(op.id, group);
+        }
+        group.ops.push(op);
+        this.renderOp(op, group);
     }
     
-    stopDrawing() {
-        if (this.isDrawing) {
-            this.isDrawing = false;
+    applyRemoteOps(ops, isSnapshot) {
+        if (!isSnapshot) {
+            ops.forEach(op => this.applyOp(op));
+            return;
         }
+        
+        // Rebuild every group (undone ones too, so redo works) and draw once
+        this.groups.clear();
+        ops.forEach(op => {
+            let group = this.groups.get(op.id);
+            if (op.type === 'undo' || op.type === 'redo') {
+                if (group) group.undone = op.type === 'undo';
+                return;
+            }
+            if (!group) {
+                group = { ops: [], undone: false, lastX: null, lastY: null };
+                this.groups.set(op.id, group);
+            }
+            group.ops.push(op);
+        });
+        this.redrawAll();
     }
     
-    clearCanvas() {
-        // Clear and restore white background
-        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+    redrawAll() {
         this.ctx.fillStyle = '#FFFFFF';
         this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
         
+        if (!this.groups) return;
+        this.groups.forEach(group => {
+            if (group.undone) return;
+            group.lastX = null;
+            group.lastY = null;
+            group.ops.forEach(op => this.renderOp(op, group));
+        });
+    }
+    
+    renderOp(op, group) {
+        const ctx = this.ctx;
+        ctx.lineCap = 'round';
+        ctx.lineJoin = 'round';
+        
+        switch (op.type) {
+            case 'stroke_begin':
+                group.color = op.color || '#000000';
+                group.size = op.size || 5;
+                break;
+            case 'stroke_points': {
+                const points = op.points || [];
+                ctx.strokeStyle = group.color || '#000000';
+                ctx.lineWidth = group.size || 5;
+                ctx.beginPath();
+                let i = 0;
+                if (group.lastX === null) {
+                    ctx.moveTo(points[0], points[1]);
+                    ctx.lineTo(points[0], points[1]);
+                    i = 2;
+                } else {
+                    ctx.moveTo(group.lastX, group.lastY);
+                }
+                for (; i < points.length; i += 2) {
+                    ctx.lineTo(points[i], points[i + 1]);
+                }
+                ctx.stroke();
+                if (points.length >= 2) {
+                    group.lastX = points[points.length - 2];
+                    group.lastY = points[points.length - 1];
+                }
+                break;
+            }
+            case 'rect':
+                ctx.strokeStyle = op.color || '#000000';
+                ctx.fillStyle = op.color || '#000000';
+                ctx.lineWidth = op.size || 5;
+                if (op.filled) {
+                    ctx.fillRect(op.x, op.y, op.w, op.h);
+                } else {
+                    ctx.strokeRect(op.x, op.y, op.w, op.h);
+                }
+                break;
+            case 'ellipse':
+                ctx.strokeStyle = op.color || '#000000';
+                ctx.fillStyle = op.color || '#000000';
+                ctx.lineWidth = op.size || 5;
+                ctx.beginPath();
+                ctx.ellipse(op.x + op.w / 2, op.y + op.h / 2, op.w / 2, op.h / 2, 0, 0, Math.PI * 2);
+                if (op.filled) {
+                    ctx.fill();
+                } else {
+                    ctx.stroke();
+                }
+                break;
+            case 'fill':
+                this.floodFill(op.x, op.y, op.color || '#000000');
+                break;
+        }
+    }
+    
+    // Scanline flood fill from (x, y) over pixels matching the start color
+    floodFill(startX, startY, color) {
+        const width = this.canvas.width;
+        const height = this.canvas.height;
+        startX = Math.floor(startX);
+        startY = Math.floor(startY);
+        if (startX < 0 || startY < 0 || startX >= width || startY >= height) return;
+        
+        const image = this.ctx.getImageData(0, 0, width, height);
+        const data = new Uint32Array(image.data.buffer);
+        const target = data[startY * width + startX];
+        
+        const hex = color.replace('#', '');
+        const r = parseInt(hex.substring(0, 2), 16);
+        const g = parseInt(hex.substring(2, 4), 16);
+        const b = parseInt(hex.substring(4, 6), 16);
+        // ImageData is RGBA in memory; read as little-endian uint32 that is ABGR
+        const fill = (255 << 24) | (b << 16) | (g << 8) | r;
+        if ((target >>> 0) === (fill >>> 0)) return;
+        
+        const stack = [startX, startY];
+        while (stack.length) {
+            const y = stack.pop();
+            let x = stack.pop();
+            let offset = y * width + x;
+            while (x > 0 && data[offset - 1] === target) {
+                x--;
+                offset--;
+            }
+            let spanAbove = false;
+            let spanBelow = false;
+            while (x < width && data[offset] === target) {
+                data[offset] = fill;
+                if (y > 0) {
+                    const above = data[offset - width] === target;
+                    if (above && !spanAbove) stack.push(x, y - 1);
+                    spanAbove = above;
+                }
+                if (y < height - 1) {
+                    const below = data[offset + width] === target;
+                    if (below && !spanBelow) stack.push(x, y + 1);
+                    spanBelow = below;
+                }
+                x++;
+                offset++;
+            }
+        }
+        this.ctx.putImageData(image, 0, 0);
+    }
+    
+    clearCanvas() {
+        // Clear and restore white background
+        this.groups.clear();
+        this.undoStack = [];
+        this.redoStack = [];
+        this.redrawAll();
+        
         if (this.socket && this.roomId) {
             this.socket.emit('clear_canvas', {
                 room_id: this.roomId,
@@ -187,9 +507,10 @@ class DrawingCanvas {
     
     clearFromRemote() {
         // Clear and restore white background
-        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
-        this.ctx.fillStyle = '#FFFFFF';
-        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+        this.groups.clear();
+        this.undoStack = [];
+        this.redoStack = [];
+        this.redrawAll();
     }
     
     setDrawerMode(isDrawer) {
@@ -198,7 +519,7 @@ class DrawingCanvas {
         this.canvas.style.pointerEvents = isDrawer ? 'auto' : 'none';
         
         // Disable/enable drawing controls
-        const controls = document.querySelectorAll('#color-picker, #brush-size, #clear-btn');
+        const controls = document.querySelectorAll('#color-picker, #brush-size, #clear-btn, #undo-btn, #redo-btn, [data-tool]');
         controls.forEach(control => {
             control.disabled = !isDrawer;
         });
@@ -209,4 +530,3 @@ class DrawingCanvas {
 if (typeof window !== 'undefined') {
     window.DrawingCanvas = DrawingCanvas;
 }
-
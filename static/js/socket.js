@@ -8,6 +8,9 @@ let playerName = null;
 let isDrawer = false;
 let gameState = null;
 let drawingCanvas = null; // Will be set when DrawingCanvas is initialized
+let resumeToken = null; // Issued by the server on join, used to resume after reconnect
+let lastSeq = 0; // Highest room event sequence number received
+let hasJoined = false;
 
 // Make variables globally accessible
 window.gameSocket = () => socket;
@@ -57,21 +60,54 @@ function initSocket() {
         setTimeout(initCanvas, 100);
     }
     
+    // Keep the token across page reloads so we can reclaim our player
+    const tokenKey = `paintit:${roomId}:${playerName}`;
+    resumeToken = sessionStorage.getItem(tokenKey);
+    
     // Function to join room
     const joinRoom = () => {
         console.log('Joining room:', roomId, 'as', playerName);
+        hasJoined = true;
         socket.emit('join_room', {
             room_id: roomId,
-            player_name: playerName
+            player_name: playerName,
+            resume_token: resumeToken
         });
     };
     
-    // Wait for connection before joining room
-    socket.once('connect', () => {
-        console.log('Socket connected, joining room...');
+    socket.on('session', (data) => {
+        resumeToken = data.token;
+        sessionStorage.setItem(tokenKey, resumeToken);
+        lastSeq = Math.max(lastSeq, data.seq || 0);
+    });
+    
+    socket.on('resume_failed', () => {
+        console.log('Session expired, joining as new player');
+        resumeToken = null;
+        sessionStorage.removeItem(tokenKey);
         joinRoom();
     });
     
+    socket.on('session_resumed', (data) => {
+        console.log(`Session resumed, replayed ${data.replayed} events`, data);
+        lastSeq = Math.max(lastSeq, data.seq || 0);
+    });
+    
+    // Join on first connect; on reconnects only ask for the events we missed
+    socket.on('connect', () => {
+        if (hasJoined && resumeToken) {
+            console.log('Socket reconnected, resuming session from', lastSeq);
+            socket.emit('resume_session', {
+                room_id: roomId,
+                token: resumeToken,
+                last_seq: lastSeq
+            });
+        } else {
+            console.log('Socket connected, joining room...');
+            joinRoom();
+        }
+    });
+    
     // Also try to join immediately if already connected
     if (socket.connected) {
         joinRoom();
@@ -79,6 +115,13 @@ function initSocket() {
 }
 
 function setupSocketListeners() {
+    // Track the room event sequence so a reconnect only replays what we missed
+    socket.onAny((event, data) => {
+        if (data && typeof data.seq === 'number' && data.seq > lastSeq) {
+            lastSeq = data.seq;
+        }
+    });
+    
     // Connection events
     socket.on('connect', () => {
         console.log('Connected to server');
@@ -155,8 +198,9 @@ function setupSocketListeners() {
             showWordBlanks(data.word_length);
         }
         
-        // Update drawer mode for canvas
+        // Update drawer mode for canvas and start from a blank canvas
         if (drawingCanvas) {
+            drawingCanvas.clearFromRemote();
             drawingCanvas.setDrawerMode(isDrawer);
         }
     });
@@ -221,6 +265,12 @@ function setupSocketListeners() {
         }
     });
     
+    socket.on('canvas_ops', (data) => {
+        if (drawingCanvas && Array.isArray(data.ops)) {
+            drawingCanvas.applyRemoteOps(data.ops, data.snapshot);
+        }
+    });
+    
     socket.on('canvas_cleared', () => {
         if (drawingCanvas) {
             drawingCanvas.clearFromRemote();
@@ -248,6 +298,19 @@ function setupSocketListeners() {
         addChatMessage(data.player, data.message, data.timestamp);
     });
     
+    // Chat merged by the server during busy moments
+    socket.on('chat_batch', (data) => {
+        (data.messages || []).forEach(msg => {
+            addChatMessage(msg.player, msg.message, msg.timestamp);
+        });
+    });
+    
+    socket.on('room_closed', (data) => {
+        addChatMessage('System', data.message || 'This room has been closed');
+        alert(data.message || 'This room has been closed');
+        window.location.href = '/';
+    });
+    
     // Error handling
     socket.on('error', (data) => {
         console.error('Socket error:', data.message);
@@ -151,6 +151,20 @@ function setupKeyboardShortcuts() {
             }
         }
         
+        // Ctrl/Cmd + Z to undo, Ctrl/Cmd + Y or Shift+Z to redo (only for drawer)
+        if ((e.ctrlKey || e.metaKey) && (e.key === 'z' || e.key === 'Z' || e.key === 'y')) {
+            const isDrawer = window.gameIsDrawer ? window.gameIsDrawer() : false;
+            const drawingCanvas = window.drawingCanvas;
+            if (isDrawer && drawingCanvas && document.activeElement.id !== 'chat-input') {
+                e.preventDefault();
+                if (e.key === 'y' || e.shiftKey) {
+                    drawingCanvas.redo();
+                } else {
+                    drawingCanvas.undo();
+                }
+            }
+        }
+        
         // C to clear canvas (only for drawer)
         if (e.key === 'c' || e.key === 'C') {
             const isDrawer = window.gameIsDrawer ? window.gameIsDrawer() : false;
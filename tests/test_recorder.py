@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.recorder import TrafficRecorder, read_recording  # noqa: E402
+
+def record(path, count, flush_every=50):
+    recorder = TrafficRecorder(flush_every=flush_every)
+    recorder.open(str(path))
+    for i in range(count):
+        recorder.record('guess', f'sid{i % 8}', {'room_id': '123456', 'guess': f'word{i}'})
+    recorder.close()
+
+def test_round_trips_multi_member_recording_over_64kb(tmp_path):
+    path = tmp_path / 'recording.jsonl.gz'
+    record(path, 20000)
+    assert os.path.getsize(path) > 65536
+
+    problems = []
+    entries = list(read_recording(str(path), problems))
+
+    assert problems == []
+    assert len(entries) == 20001  # Session header + every event
+    assert entries[0]['event'] == '_session'
+    assert [e['data']['guess'] for e in entries[1:]] == [f'word{i}' for i in range(20000)]
+
+def test_keeps_intact_members_of_truncated_recording(tmp_path):
+    path = tmp_path / 'recording.jsonl.gz'
+    record(path, 2000)
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 10)
+
+    problems = []
+    entries = list(read_recording(str(path), problems))
+
+    assert len(problems) == 1
+    assert 1900 < len(entries) < 2001